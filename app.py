@@ -1,11 +1,17 @@
+import importlib
+
 import streamlit as st
 
-from csr import run as run_csr
-from crr_cpt import run as run_crr_cpt
-from crr_spt import run as run_crr_spt
-from crr_dmt import run as run_crr_dmt
-from crr_vs import run as run_crr_vs
-from crr_clay import run as run_crr_clay
+# Page labels, in sidebar order ("Home" last)
+_PAGES: tuple[str, ...] = (
+    "CSR",
+    "CRR – CPT",
+    "CRR – SPT",
+    "CRR – DMT",
+    "CRR – Vs",
+    "CRR – Clay / Plastic silt",
+    "Home",
+)
 
 
 # ----------------------------
@@ -22,6 +28,29 @@ st.set_page_config(
 if "page" not in st.session_state:
     st.session_state.page = "Home"
 
+if "_mod_cache" not in st.session_state:
+    st.session_state["_mod_cache"] = {}
+
+
+# ----------------------------
+# Lazy module loading
+# ----------------------------
+def load_run(module_name):
+    """Import an analysis module on first visit and return its run()."""
+    cache = st.session_state["_mod_cache"]
+    if module_name not in cache:
+        cache[module_name] = importlib.import_module(module_name)
+    return cache[module_name].run
+
+
+# ----------------------------
+# Navigation callbacks
+# ----------------------------
+# Widget callbacks run before the script reruns, so the new page is
+# already set when the router executes (no extra st.rerun needed).
+def go_to_selected(key):
+    st.session_state.page = st.session_state[key]
+
 
 # ----------------------------
 # HOME PAGE (no sidebar here)
@@ -35,36 +64,17 @@ def home():
     col1, col2 = st.columns(2)
 
     with col1:
-        if st.button("CSR", key="btn_csr", use_container_width=True):
-            st.session_state.page = "CSR"
-            st.rerun()
-
-        if st.button("CRR – CPT", key="btn_cpt", use_container_width=True):
-            st.session_state.page = "CRR – CPT"
-            st.rerun()
-
-        if st.button("CRR – SPT", key="btn_spt", use_container_width=True):
-            st.session_state.page = "CRR – SPT"
-            st.rerun()
+        st.radio(
+            "Select analysis",
+            _PAGES[:-1],
+            index=None,
+            key="home_nav",
+            label_visibility="collapsed",
+            on_change=go_to_selected,
+            args=("home_nav",),
+        )
 
     with col2:
-        if st.button("CRR – DMT", key="btn_dmt", use_container_width=True):
-            st.session_state.page = "CRR – DMT"
-            st.rerun()
-
-        if st.button("CRR – Vs", key="btn_vs", use_container_width=True):
-            st.session_state.page = "CRR – Vs"
-            st.rerun()
-
-        if st.button(
-            "CRR – Clay / Plastic silt",
-            key="btn_clay",
-            use_container_width=True
-        ):
-            st.session_state.page = "CRR – Clay / Plastic silt"
-            st.rerun()
-            
-
         st.divider()
 
         st.caption(
@@ -95,32 +105,21 @@ def home():
 def module_sidebar():
     st.sidebar.title("Liquefaction Toolkit")
 
-    options = [
-        "CSR",
-        "CRR – CPT",
-        "CRR – SPT",
-        "CRR – DMT",
-        "CRR – Vs",
-        "CRR – Clay / Plastic silt",
-        "Home",
-    ]
-
     # Set default index based on current page
     try:
-        index = options.index(st.session_state.page)
+        index = _PAGES.index(st.session_state.page)
     except ValueError:
         index = 0
 
-    page = st.sidebar.radio(
+    st.sidebar.radio(
         "Switch analysis",
-        options,
+        _PAGES,
         index=index,
+        key="nav",
+        on_change=go_to_selected,
+        args=("nav",),
     )
 
-    if page != st.session_state.page:
-        st.session_state.page = page
-        st.rerun()
-
     st.sidebar.divider()
     st.sidebar.caption(
         "Initial release (v0.1). Educational and preliminary analysis only. "
@@ -131,31 +130,27 @@ def module_sidebar():
 # ----------------------------
 # ROUTER
 # ----------------------------
-if st.session_state.page == "Home":
+def show_home():
     # Hide sidebar on Home (important for mobile clarity)
     st.sidebar.empty()
     home()
 
-elif st.session_state.page == "CSR":
-    module_sidebar()
-    run_csr()
-
-elif st.session_state.page == "CRR – CPT":
-    module_sidebar()
-    run_crr_cpt()
 
-elif st.session_state.page == "CRR – SPT":
-    module_sidebar()
-    run_crr_spt()
+def module_page(module_name):
+    def show():
+        module_sidebar()
+        load_run(module_name)()
+    return show
 
-elif st.session_state.page == "CRR – DMT":
-    module_sidebar()
-    run_crr_dmt()
 
-elif st.session_state.page == "CRR – Vs":
-    module_sidebar()
-    run_crr_vs()
+_ROUTES = {
+    "Home": show_home,
+    "CSR": module_page("csr"),
+    "CRR – CPT": module_page("crr_cpt"),
+    "CRR – SPT": module_page("crr_spt"),
+    "CRR – DMT": module_page("crr_dmt"),
+    "CRR – Vs": module_page("crr_vs"),
+    "CRR – Clay / Plastic silt": module_page("crr_clay"),
+}
 
-elif st.session_state.page == "CRR – Clay / Plastic silt":
-    module_sidebar()
-    run_crr_clay()
+_ROUTES.get(st.session_state.page, show_home)()
@@ -2,11 +2,28 @@
 import streamlit as st
 import numpy as np
 
+
+@st.cache_data(show_spinner=False)
+def _clay_cpt_crr(qt, sigma_vc, Pa, n_star):
+    """CPT-based CRR_base for clay: returns (Qtn, CRR_base)."""
+    Qtn = ((qt - sigma_vc) / Pa) * (Pa / sigma_vc) ** n_star
+    return Qtn, 0.053 * Qtn
+
+
+@st.cache_data(show_spinner=False)
+def _clay_dmt_crr(p0, p1, sigma_v0):
+    """DMT-based CRR_base for clay: returns (K_D, CRR_base)."""
+    K_D = (p1 - p0) / sigma_v0
+    return K_D, 0.074 * (K_D ** 1.25)
+
+
+@st.cache_data(show_spinner=False)
+def _clay_ocr_crr(OCR):
+    """Empirical OCR-based CRR_base for clay."""
+    return 0.18 * (OCR ** 0.8)
+
+
 def run():
-    st.set_page_config(
-        page_title="CRR — clay & plastic silt",
-        layout="wide"
-    )
     st.header("CRR — clay & plastic silt")
     st.markdown("""
     Compute CRR for clay / plastic silt using one of:
@@ -16,51 +33,63 @@ def run():
     Final CRR = CRR_base * MSF * K_sigma (CRR_base capped at 1.0).
     """)
 
-    col1, = st.columns(1)
-    with col1:
-        method = st.selectbox("Method", ["CPT", "DMT", "OCR"])
-        Pa = st.number_input("Atmospheric pressure Pa (kPa)", value=101.325, format="%.6f")
-        MSF = st.number_input("MSF (magnitude scaling factor)", value=1.0, format="%.6f")
-        K_sigma = st.number_input("K_sigma (overburden correction)", value=1.0, format="%.6f")
-        st.write("Method-specific inputs below")
+    # The method changes which inputs are shown, so it sits outside the form.
+    method = st.selectbox("Method", ["CPT", "DMT", "OCR"])
 
+    with st.form("clay_form"):
+        col1, = st.columns(1)
+        with col1:
+            Pa = st.number_input("Atmospheric pressure Pa (kPa)", value=101.325, format="%.6f")
+            MSF = st.number_input("MSF (magnitude scaling factor)", value=1.0, format="%.6f")
+            K_sigma = st.number_input("K_sigma (overburden correction)", value=1.0, format="%.6f")
+            st.write("Method-specific inputs below")
 
-    st.markdown("---")
+        st.markdown("---")
+
+        if method == "CPT":
+            st.subheader("CPT inputs")
+            qt = st.number_input("Cone tip resistance qt (kPa)", value=150.0, format="%.3f")
+            sigma_vc = st.number_input("Effective consolidation stress σ'vc (kPa)", value=100.0, format="%.3f")
+            n_star = st.selectbox("n* (choose exponent)", [1.0, 0.5], index=0, format_func=lambda x: f"{x:.1f}")
+
+        elif method == "DMT":
+            st.subheader("DMT inputs")
+            p0 = st.number_input("p0 (lift-off pressure) (kPa)", value=200.0, format="%.3f")
+            p1 = st.number_input("p1 (expansion pressure) (kPa)", value=400.0, format="%.3f")
+            sigma_v0 = st.number_input("Effective vertical stress σ'v0 (kPa)", value=100.0, format="%.3f")
+
+        else:  # OCR empirical
+            st.subheader("OCR inputs")
+            OCR = st.number_input("Overconsolidation ratio (OCR)", value=2.0, format="%.3f")
+
+        submitted = st.form_submit_button("Compute CRR")
+
+    if not submitted:
+        st.caption("Press **Compute CRR** to evaluate the selected method.")
+        return
 
     CRR_base = None
 
     if method == "CPT":
-        st.subheader("CPT inputs")
-        qt = st.number_input("Cone tip resistance qt (kPa)", value=150.0, format="%.3f")
-        sigma_vc = st.number_input("Effective consolidation stress σ'vc (kPa)", value=100.0, format="%.3f")
-        n_star = st.selectbox("n* (choose exponent)", [1.0, 0.5], index=0, format_func=lambda x: f"{x:.1f}")
         # compute Qtn safely
         if sigma_vc <= 0:
             st.error("σ'vc must be > 0")
             return
-        Qtn = ((qt - sigma_vc) / Pa) * (Pa / sigma_vc) ** n_star
+        Qtn, CRR_base = _clay_cpt_crr(qt, sigma_vc, Pa, n_star)
         st.write(f"Normalized tip resistance Qtn = {Qtn:.4f}")
-        CRR_base = 0.053 * Qtn
 
     elif method == "DMT":
-        st.subheader("DMT inputs")
-        p0 = st.number_input("p0 (lift-off pressure) (kPa)", value=200.0, format="%.3f")
-        p1 = st.number_input("p1 (expansion pressure) (kPa)", value=400.0, format="%.3f")
-        sigma_v0 = st.number_input("Effective vertical stress σ'v0 (kPa)", value=100.0, format="%.3f")
         if sigma_v0 <= 0:
             st.error("σ'v0 must be > 0")
             return
-        K_D = (p1 - p0) / sigma_v0
+        K_D, CRR_base = _clay_dmt_crr(p0, p1, sigma_v0)
         st.write(f"Horizontal stress index K_D = {K_D:.4f}")
-        CRR_base = 0.074 * (K_D ** 1.25)
 
     else:  # OCR empirical
-        st.subheader("OCR inputs")
-        OCR = st.number_input("Overconsolidation ratio (OCR)", value=2.0, format="%.3f")
         if OCR <= 0:
             st.error("OCR must be > 0")
             return
-        CRR_base = 0.18 * (OCR ** 0.8)
+        CRR_base = _clay_ocr_crr(OCR)
         st.write(f"OCR = {OCR:.3f}")
 
     # Clamp CRR_base to <= 1.0
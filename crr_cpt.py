@@ -1,72 +1,208 @@
-def run():
+import contextlib
+import gc
+from types import MappingProxyType
+
+import streamlit as st
+from math import exp, log, log10, sqrt
+
+
+@st.cache_resource
+def _constants():
+    """Correlation constants used by the CPT path (shared across sessions, read-only)."""
+    return MappingProxyType({
+        "C_FC": -0.07,
+        "msf_cap": 2.2,
+        "C_sigma_cap": 0.3,
+        "K_sigma_cap": 1.1,
+    })
+
+
+@contextlib.contextmanager
+def _no_gc():
+    """Pause the cyclic garbage collector for the duration of a solve."""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def delta_qc1N_factor(FC):
+    # FC-dependent part of delta_qc1N = (11.9 + qc1N/14.6) * factor
+    denom = (FC + 2.0)
+    return exp(1.63 - (9.7 / denom) - (15.7 / denom) ** 2)
+
+
+def _cpt_update(m, R, qCN, dq_exp):
+    """One fixed-point update of the CPT path (R = Pa/sigma_vc): returns (m_new, qc1Ncs)."""
+    CN = R ** m
+    if CN > 1.7:
+        CN = 1.7
+    qc1N = CN * qCN
+    dq = (11.9 + qc1N / 14.6) * dq_exp
+    qc1Ncs = qc1N + dq
+    if qc1Ncs < 1e-6:
+        qc1Ncs = 1e-6
+    m_new = 1.338 - 0.249 * qc1Ncs ** 0.264
+    # clamp m to valid range for formula
+    if m_new < 0.246:
+        m_new = 0.246
+    if m_new > 0.782:
+        m_new = 0.782
+    return m_new, qc1Ncs
+
+
+def _bracketed_root(f, a, b, xtol, maxiter, x0=None):
     """
-    Streamlit app: CRR calculator (CPT path, iterative solution for m and qc1Ncs)
-    Improved: accepts FC directly or computes it from inputs; computes MSF_max from qc1Ncs by default.
+    Root of f on [a, b] by the Illinois (modified regula falsi) method.
 
-    How to run:
-        pip install streamlit numpy
-        streamlit run crr_cpt_streamlit.py
+    If x0 lies inside (a, b) it is evaluated first and used to narrow the
+    bracket before the first secant step.
 
-    Notes:
-     - This app currently implements the CPT-based iterative solver to find qc1Ncs and m,
-       calculates the magnitude scaling factor (MSF), overburden correction C_sigma, K_sigma and
-       final CRR using the formulas you provided.
-     - Units: pressures in kPa. Pa (atmospheric pressure) default set to 101.325 kPa.
+    Returns (x, n_evals, converged). Raises ValueError if f(a) and f(b)
+    have the same sign.
     """
+    fa = f(a)
+    fb = f(b)
+    n_evals = 2
+    if fa == 0.0:
+        return a, n_evals, True
+    if fb == 0.0:
+        return b, n_evals, True
+    if (fa > 0.0) == (fb > 0.0):
+        raise ValueError("f(a) and f(b) must have different signs")
+
+    x_prev = a
+    if x0 is not None and a < x0 < b:
+        f0 = f(x0)
+        n_evals += 1
+        if f0 == 0.0:
+            return x0, n_evals, True
+        if (f0 > 0.0) == (fb > 0.0):
+            b, fb = x0, f0
+        else:
+            a, fa = x0, f0
+        x_prev = x0
+
+    side = 0
+    x = x_prev
+    for _ in range(maxiter):
+        x = (a * fb - b * fa) / (fb - fa)
+        fx = f(x)
+        n_evals += 1
+        if fx == 0.0 or abs(x - x_prev) < xtol:
+            return x, n_evals, True
+        if (fx > 0.0) == (fb > 0.0):
+            b, fb = x, fx
+            if side == -1:
+                fa *= 0.5
+            side = -1
+        else:
+            a, fa = x, fx
+            if side == 1:
+                fb *= 0.5
+            side = 1
+        x_prev = x
+    return x, n_evals, False
 
-    import streamlit as st
-    import numpy as np
-    from math import log10, sqrt
 
-    st.set_page_config(page_title="CRR (CPT) calculator", layout="centered")
-    st.title("CRR calculator — CPT (iterative solver)")
+@st.cache_data(show_spinner=False)
+def _solve_qc1Ncs(qt, sigma_vc, Pa, FC, init_m, tol, max_iter):
+    """
+    Solve the CPT path for m and qc1Ncs.
 
-    # --- Inputs ---
-    col1, col2 = st.columns(2)
-    with col1:
-        qt = st.number_input("Cone tip resistance, qt (kPa)", value=150.0, format="%.3f")
-        sigma_vc = st.number_input("Effective vertical consolidation stress, σ'vc (kPa)", value=100.0, format="%.3f")
-        sigma_v0 = st.number_input("Current effective vertical stress at depth, σ'v0 (kPa)", value=100.0, format="%.3f")
-        Pa = st.number_input("Atmospheric pressure Pa (kPa)", value=101.325, format="%.6f")
+    m is the root of m - m_new(m) on the clamp range [0.246, 0.782], found
+    with a bracketed root search seeded at init_m. The clamp keeps the
+    residual <= 0 at 0.246 and >= 0 at 0.782, so the bracket always holds.
 
-    with col2:
-        M = st.number_input("Mw — magnitude of largest likely earthquake (M)", value=7.5, format="%.3f")
-        n_for_Qtn = st.selectbox("n for Qtn (use 0.5 for sand, 1.0 for clay)", options=[0.5, 1.0], index=0)
+    Returns (m, qc1Ncs, converged, n_evals), where n_evals counts residual
+    evaluations. Arguments are plain floats/ints so Streamlit can memoise
+    the result across reruns.
+    """
+    qCN = qt / Pa
+    R = Pa / sigma_vc
+    dq_exp = delta_qc1N_factor(FC)
 
-    st.markdown("---")
+    # CN = R**m hits the 1.7 cap for every m >= m_sat (only possible when R > 1).
+    # Past m_sat the update is the constant m_cap; if m_cap is itself past
+    # m_sat it is the root (the residual is increasing, so the root is unique).
+    m_sat = log(1.7) / log(R) if R > 1.0 else float("inf")
+    if m_sat <= 0.782:
+        m_cap, qc1Ncs = _cpt_update(0.782, R, qCN, dq_exp)
+        if m_cap >= m_sat:
+            return float(m_cap), float(qc1Ncs), True, 1
 
-    # FC / Ic handling
-    use_direct_FC = st.checkbox("Provide fines content (FC) directly?", value=False)
-    if use_direct_FC:
-        FC = st.number_input("Fines content, FC (percent)", value=5.0, format="%.3f")
-        st.info("Since you provided FC directly, sleeve friction fs is optional and not required for FC calculation.")
-        fs = st.number_input("Sleeve friction, fs (kPa) — optional", value=0.0, format="%.3f")
-        Ic = None
-    else:
-        st.write("We'll compute FC from Ic (soil behaviour type index). You may enter Ic manually or let the app compute it using Qtn and F.")
-        provide_Ic_manual = st.checkbox("Provide Ic (soil behaviour index) manually?", value=False)
-        if provide_Ic_manual:
-            Ic = st.number_input("Soil behaviour type index, Ic", value=0.0, format="%.3f")
-            fs = st.number_input("Sleeve friction, fs (kPa) — required to compute friction ratio F", value=5.0, format="%.3f")
-        else:
-            # compute Ic from Qtn and F: need fs
-            fs = st.number_input("Sleeve friction, fs (kPa) — required to compute Qtn and F", value=5.0, format="%.3f")
-            Ic = None
+    def residual(m):
+        return m - _cpt_update(m, R, qCN, dq_exp)[0]
 
-    st.markdown("---")
+    with _no_gc():
+        root, n_evals, converged = _bracketed_root(
+            residual, 0.246, 0.782, tol, int(max_iter), x0=init_m
+        )
 
-    # Iteration options
-    st.markdown("**Iteration / solver settings**")
-    init_m = st.number_input("Initial guess for m", value=0.6, format="%.6f")
-    tol = st.number_input("Tolerance for m convergence", value=1e-4, format="%.8f")
-    max_iter = st.number_input("Maximum iterations", value=200, step=10)
+        # recover qc1Ncs (and the clamped m) consistent with the root
+        m, qc1Ncs = _cpt_update(root, R, qCN, dq_exp)
+    return float(m), float(qc1Ncs), converged, n_evals
 
-    # MSF_max override option
-    provide_MSF_manual = st.checkbox("Provide MSF_max manually? (If unchecked, MSF_max is computed from qc1Ncs)", value=False)
-    if provide_MSF_manual:
-        MSF_max_user = st.number_input("MSF_max (manual)", value=1.6, format="%.3f")
-    else:
-        MSF_max_user = None
+
+@st.fragment
+def _render_results(options):
+    """
+    Inputs form, solver call and result display for the CPT path.
+
+    Runs as a fragment: pressing "Compute CRR" reruns only this function,
+    not the router, sidebar or input-mode toggles around it.
+    """
+    use_direct_FC, provide_Ic_manual, provide_MSF_manual = options
+    const = _constants()
+
+    with st.form("cpt_form"):
+        # --- Inputs ---
+        col1, col2 = st.columns(2)
+        with col1:
+            qt = st.number_input("Cone tip resistance, qt (kPa)", value=150.0, format="%.3f")
+            sigma_vc = st.number_input("Effective vertical consolidation stress, σ'vc (kPa)", value=100.0, format="%.3f")
+            sigma_v0 = st.number_input("Current effective vertical stress at depth, σ'v0 (kPa)", value=100.0, format="%.3f")
+            Pa = st.number_input("Atmospheric pressure Pa (kPa)", value=101.325, format="%.6f")
+
+        with col2:
+            M = st.number_input("Mw — magnitude of largest likely earthquake (M)", value=7.5, format="%.3f")
+            n_for_Qtn = st.selectbox("n for Qtn (use 0.5 for sand, 1.0 for clay)", options=[0.5, 1.0], index=0)
+
+        st.markdown("---")
+
+        # FC / Ic handling
+        if use_direct_FC:
+            FC = st.number_input("Fines content, FC (percent)", value=5.0, format="%.3f")
+            st.info("Since you provided FC directly, sleeve friction fs is optional and not required for FC calculation.")
+            fs = st.number_input("Sleeve friction, fs (kPa) — optional", value=0.0, format="%.3f")
+            Ic = None
+        else:
+            st.write("We'll compute FC from Ic (soil behaviour type index). You may enter Ic manually or let the app compute it using Qtn and F.")
+            if provide_Ic_manual:
+                Ic = st.number_input("Soil behaviour type index, Ic", value=0.0, format="%.3f")
+                fs = st.number_input("Sleeve friction, fs (kPa) — required to compute friction ratio F", value=5.0, format="%.3f")
+            else:
+                # compute Ic from Qtn and F: need fs
+                fs = st.number_input("Sleeve friction, fs (kPa) — required to compute Qtn and F", value=5.0, format="%.3f")
+                Ic = None
+
+        st.markdown("---")
+
+        # Iteration options
+        st.markdown("**Iteration / solver settings**")
+        init_m = st.number_input("Initial guess for m (seeds the root search)", value=0.6, format="%.6f")
+        tol = st.number_input("Tolerance for m convergence", value=1e-4, format="%.8f")
+        max_iter = st.number_input("Maximum solver steps", value=200, step=10)
+
+        if provide_MSF_manual:
+            MSF_max_user = st.number_input("MSF_max (manual)", value=1.6, format="%.3f")
+        else:
+            MSF_max_user = None
+
+        submitted = st.form_submit_button("Compute CRR")
 
     # --- helper functions ---
 
@@ -85,143 +221,119 @@ def run():
 
     def compute_Ic_from_Q_F(Qtn, F):
         # Ic = sqrt((3.47 - logQ)^2 + (1.22 + logF)^2)
-        logQ = log10(Qtn) if Qtn > 0 else -10.0
-        logF = log10(F) if F > 0 else -10.0
+        logQ = log10(max(Qtn, 1e-12))
+        logF = log10(max(F, 1e-12))
         return sqrt((3.47 - logQ) ** 2 + (1.22 + logF) ** 2)
 
 
-    def estimate_FC_from_Ic(Ic, C_FC=-0.07):
+    def estimate_FC_from_Ic(Ic, C_FC):
         return 80.0 * (Ic + C_FC) - 137.0
 
-
-    def delta_qc1N_formula(qc1N, FC):
-        denom = (FC + 2.0)
-        exponent = 1.63 - (9.7 / denom) - (15.7 / denom) ** 2
-        return (11.9 + qc1N / 14.6) * np.exp(exponent)
-
-
-    def compute_m_from_qc1Ncs(qc1Ncs):
-        return 1.338 - 0.249 * (qc1Ncs ** 0.264)
-
     # --- compute FC, Ic, F depending on inputs ---
-    C_FC = -0.07
+    C_FC = const["C_FC"]
+    # status lines are collected and rendered as a single markdown element
+    lines = []
 
     if use_direct_FC:
         # FC provided directly
         computed_F = compute_F_from_fs(qt, fs, sigma_vc) if fs > 0 else None
         Ic_display = None
-        st.write(f"C_FC (constant) = {C_FC}")
+        lines.append(f"C_FC (constant) = {C_FC}")
     else:
         # FC must be computed
         computed_F = compute_F_from_fs(qt, fs, sigma_vc)
-        st.write(f"Computed sleeve friction ratio F = {computed_F:.4f} % (using fs={fs} kPa)")
-        st.write(f"C_FC (constant) = {C_FC}")
+        lines.append(f"Computed sleeve friction ratio F = {computed_F:.4f} % (using fs={fs} kPa)")
+        lines.append(f"C_FC (constant) = {C_FC}")
         if provide_Ic_manual and Ic is not None and Ic != 0.0:
             Ic_display = Ic
-            st.write(f"Using manual Ic = {Ic_display:.4f}")
+            lines.append(f"Using manual Ic = {Ic_display:.4f}")
         else:
             Qtn = compute_Qtn(qt, sigma_vc, Pa, n_for_Qtn)
             Ic_display = compute_Ic_from_Q_F(Qtn, computed_F)
-            st.write(f"Computed Ic from Qtn & F = {Ic_display:.4f}")
+            lines.append(f"Computed Ic from Qtn & F = {Ic_display:.4f}")
         FC = estimate_FC_from_Ic(Ic_display, C_FC=C_FC)
         # clamp
         FC = float(max(min(FC, 100.0), 0.0))
 
     if use_direct_FC:
-        st.write(f"Fines content (FC) (user provided) = {FC:.3f} %")
+        lines.append(f"Fines content (FC) (user provided) = {FC:.3f} %")
     else:
-        st.write(f"Estimated fines content (FC) from Ic = {FC:.3f} %")
+        lines.append(f"Estimated fines content (FC) from Ic = {FC:.3f} %")
+
+    st.markdown("  \n".join(lines))
 
     st.markdown("---")
 
+    if not submitted:
+        st.caption("Press **Compute CRR** to run the iterative solver.")
+        return
+
     # --- Iterative solver for CPT path ---
     st.markdown("### Iterative solution (CPT) to find qc1Ncs and m")
 
-    # normalized tip resistance qCN
-    qCN = qt / Pa
-
-    m = float(init_m)
-    qc1Ncs = None
-    last_m = None
-    converged = False
-    for it in range(int(max_iter)):
-        CN = (Pa / sigma_vc) ** m
-        if CN > 1.7:
-            CN = 1.7
-        qc1N = CN * qCN
-        dq = delta_qc1N_formula(qc1N, FC)
-        qc1Ncs_new = qc1N + dq
-        if qc1Ncs_new < 1e-6:
-            qc1Ncs_new = 1e-6
-        m_new = compute_m_from_qc1Ncs(qc1Ncs_new)
-        # clamp m to valid range for formula
-        if m_new < 0.246:
-            m_new = 0.246
-        if m_new > 0.782:
-            m_new = 0.782
-        if last_m is not None and abs(m_new - last_m) < tol:
-            m = m_new
-            qc1Ncs = qc1Ncs_new
-            converged = True
-            iter_count = it + 1
-            break
-        last_m = m_new
-        m = m_new
-        qc1Ncs = qc1Ncs_new
-    else:
-        iter_count = max_iter
+    m, qc1Ncs, converged, n_evals = _solve_qc1Ncs(
+        float(qt), float(sigma_vc), float(Pa), float(FC),
+        float(init_m), float(tol), int(max_iter),
+    )
 
-    # show iteration results
+    # show solver results
     if converged:
-        st.success(f"Converged in {iter_count} iterations")
+        st.success(f"Converged in {n_evals} residual evaluations")
     else:
-        st.warning(f"Did not converge within {iter_count} iterations; last m={m:.6f}")
+        st.warning(f"Did not converge within {n_evals} residual evaluations; last m={m:.6f}")
 
-    st.write(f"m = {m:.6f}")
-    st.write(f"qc1Ncs = {qc1Ncs:.4f} (dimensionless normalized value)")
+    lines = [
+        f"m = {m:.6f}",
+        f"qc1Ncs = {qc1Ncs:.4f} (dimensionless normalized value)",
+    ]
 
     # --- compute CRR_base from qc1Ncs ---
     qc = qc1Ncs
-    CRR_base = np.exp(qc / 113.0 + (qc / 1000.0) ** 2 - (qc / 140.0) ** 3 + (qc / 137.0) ** 4 - 2.8)
-    st.write(f"CRR (base, Mw=7.5, σ'v0=1 atm) = {CRR_base:.6e}")
+    CRR_base = exp(qc / 113.0 + (qc / 1000.0) ** 2 - (qc / 140.0) ** 3 + (qc / 137.0) ** 4 - 2.8)
+    lines.append(f"CRR (base, Mw=7.5, σ'v0=1 atm) = {CRR_base:.6e}")
 
     # --- compute MSF_max from qc1Ncs (CPT) unless user provided ---
     # expression: 1.09*(qc1Ncs/180)^3 <= 2.2
     msf_max_cpt = 1.09 * (qc1Ncs / 180.0) ** 3
-    msf_max_cpt = min(msf_max_cpt, 2.2)
-    st.write(f"MSF_max (from CPT expression) = {msf_max_cpt:.6f} (capped at 2.2)")
+    msf_max_cpt = min(msf_max_cpt, const["msf_cap"])
+    lines.append(f"MSF_max (from CPT expression) = {msf_max_cpt:.6f} (capped at {const['msf_cap']})")
 
     if provide_MSF_manual and MSF_max_user is not None:
         MSF_max = MSF_max_user
+        # flush the lines so far: the note sits between MSF_max and MSF
+        st.markdown("  \n".join(lines))
+        lines = []
         st.info(f"Using user-provided MSF_max = {MSF_max:.3f}")
     else:
         MSF_max = msf_max_cpt
 
     # --- MSF ---
-    MSF = 1.0 + (MSF_max - 1.0) * (8.64 * np.exp(-0.25 * M) - 1.325)
-    st.write(f"Magnitude scaling factor MSF = {MSF:.6f}")
+    MSF = 1.0 + (MSF_max - 1.0) * (8.64 * exp(-0.25 * M) - 1.325)
+    lines.append(f"Magnitude scaling factor MSF = {MSF:.6f}")
 
     # --- C_sigma (use CPT expression) ---
     try:
         denom = (37.3 - 8.27 * (qc1Ncs)**0.264)
         if denom <= 0:
-            C_sigma = 0.3
+            C_sigma = const["C_sigma_cap"]
         else:
             C_sigma = 1.0 / (37.3 - 8.27 * (qc1Ncs)** 0.264)
-            C_sigma = min(C_sigma, 0.3)
+            C_sigma = min(C_sigma, const["C_sigma_cap"])
     except Exception:
-        C_sigma = 0.3
+        C_sigma = const["C_sigma_cap"]
 
-    st.write(f"C_sigma (CPT formula) = {C_sigma:.6f}")
+    lines.append(f"C_sigma (CPT formula) = {C_sigma:.6f}")
 
     # --- K_sigma ---
     if sigma_v0 <= 0:
         K_sigma = 1.0
     else:
-        K_sigma = 1.0 - C_sigma * np.log(sigma_vc / Pa)
-        K_sigma = min(K_sigma, 1.1)
+        K_sigma = 1.0 - C_sigma * log(sigma_vc / Pa)
+        K_sigma = min(K_sigma, const["K_sigma_cap"])
+
+    lines.append(f"K_sigma = {K_sigma:.6f}")
 
-    st.write(f"K_sigma = {K_sigma:.6f}")
+    st.markdown("  \n".join(lines))
 
     # --- final CRR ---
     CRR = CRR_base * MSF * K_sigma
@@ -230,3 +342,33 @@ def run():
     st.metric("Cyclic Resistance Ratio (CRR)", f"{CRR:.6e}")
 
     st.markdown("---")
+
+
+def run():
+    """
+    Streamlit app: CRR calculator (CPT path, iterative solution for m and qc1Ncs)
+    Improved: accepts FC directly or computes it from inputs; computes MSF_max from qc1Ncs by default.
+
+    How to run:
+        pip install streamlit
+        streamlit run crr_cpt_streamlit.py
+
+    Notes:
+     - This app currently implements the CPT-based iterative solver to find qc1Ncs and m,
+       calculates the magnitude scaling factor (MSF), overburden correction C_sigma, K_sigma and
+       final CRR using the formulas you provided.
+     - Units: pressures in kPa. Pa (atmospheric pressure) default set to 101.325 kPa.
+    """
+
+    st.title("CRR calculator — CPT (iterative solver)")
+
+    # --- Input mode ---
+    # These toggles change which inputs are shown, so they sit outside the form.
+    use_direct_FC = st.checkbox("Provide fines content (FC) directly?", value=False)
+    provide_Ic_manual = False
+    if not use_direct_FC:
+        provide_Ic_manual = st.checkbox("Provide Ic (soil behaviour index) manually?", value=False)
+    # MSF_max override option
+    provide_MSF_manual = st.checkbox("Provide MSF_max manually? (If unchecked, MSF_max is computed from qc1Ncs)", value=False)
+
+    _render_results((use_direct_FC, provide_Ic_manual, provide_MSF_manual))
@@ -1,13 +1,12 @@
 import streamlit as st
 import numpy as np
-from math import sqrt, log10
+
+from crr_spt_core import _compute_crr_spt, _compute_crr_spt_profile, _constants
+
 
 def run():
-    st.set_page_config(
-        page_title="CRR-SPT Calculator",
-        layout="wide"
-    )
     st.header("CRR — SPT (iterative)")
+    const = _constants()
 
     col1, col2 = st.columns(2)
     with col1:
@@ -40,105 +39,88 @@ def run():
     st.markdown("**Note (informational):** If you instead had raw N, use correction factors CE, CR, CB, CS and Nm to compute N60 before running this module.")
     st.latex(r"N_{60} = C_N \; C_E \; C_R \; C_B \; C_S \; N_m")
 
-    # Iteration
-    q = N60
-    m = float(init_m)
-    last_m = None
-    N1_60cs = None
-    converged = False
-
-    for it in range(int(max_iter)):
-        CN = (Pa / sigma_vc) ** m if sigma_vc > 0 else 1.0
-        if CN > 1.7:
-            CN = 1.7
-
-        N1_60 = CN * q
-
-        denom = FC + 0.01
-        if denom <= 0:
-            delta_N1_60 = 0.0
-        else:
-            exponent = 1.63 + (9.7 / denom) - (15.7 / denom) ** 2
-            delta_N1_60 = np.exp(exponent)
-
-        N1_60cs_new = N1_60 + delta_N1_60
-        if N1_60cs_new < 1e-6:
-            N1_60cs_new = 1e-6
-
-        m_new = 0.784 - 0.0768 * sqrt(N1_60cs_new)
-
-##        # clamp m if desired
-##        if m_new < 0.246:
-##            m_new = 0.246
-##        if m_new > 0.782:
-##            m_new = 0.782
-
-        if last_m is not None and abs(m_new - last_m) < tol:
-            m = m_new
-            N1_60cs = N1_60cs_new
-            iter_count = it + 1
-            converged = True
-            break
-
-        last_m = m_new
-        m = m_new
-        N1_60cs = N1_60cs_new
-    else:
-        iter_count = max_iter
+    res = _compute_crr_spt(
+        float(N60), float(sigma_vc), float(sigma_v0), float(Pa), float(M), float(FC),
+        float(init_m), float(tol), int(max_iter),
+        float(MSF_max_user) if provide_MSF_manual else None,
+    )
 
-    if converged:
-        st.success(f"Converged in {iter_count} iterations")
+    if res["converged"]:
+        st.success(f"Converged in {res['iter_count']} iterations")
     else:
-        st.warning(f"Did not converge within {iter_count} iterations; last m={m:.6f}")
-
-    st.write(f"Final m = {m:.6f}")
-    st.write(f"CN = {CN:.4f}")
-    st.write(f"(N1)60 = {N1_60:.4f}")
-    st.write(f"(N1)60cs = {N1_60cs:.4f}")
+        st.warning(f"Did not converge within {res['iter_count']} iterations; last m={res['m']:.6f}")
 
-    # CRR base
-    N = N1_60cs
-    CRR_base = np.exp(-2.8 + (N / 14.1) + (N / 126.0) ** 2 - (N / 23.6) ** 3 + (N / 25.4) ** 4)
-    st.write(f"CRR (base, Mw=7.5, σ'v0=1 atm) = {CRR_base:.6e}")
+    st.write(f"Final m = {res['m']:.6f}")
+    st.write(f"CN = {res['CN']:.4f}")
+    st.write(f"(N1)60 = {res['N1_60']:.4f}")
+    st.write(f"(N1)60cs = {res['N1_60cs']:.4f}")
 
-    msf_max_spt = 1.09 * (N1_60cs / 31.5) ** 2
-    msf_max_spt = min(msf_max_spt, 2.2)
-    st.write(f"MSF_max (from SPT expression) = {msf_max_spt:.6f} (capped at 2.2)")
+    st.write(f"CRR (base, Mw=7.5, σ'v0=1 atm) = {res['CRR_base']:.6e}")
+    st.write(f"MSF_max (from SPT expression) = {res['msf_max_spt']:.6f} (capped at {const['msf_cap']})")
 
-    if provide_MSF_manual and MSF_max_user is not None:
-        MSF_max = MSF_max_user
-        st.info(f"Using user-provided MSF_max = {MSF_max:.3f}")
-    else:
-        MSF_max = msf_max_spt
-
-    MSF = 1.0 + (MSF_max - 1.0) * (8.64 * np.exp(-0.25 * M) - 1.325)
-    st.write(f"Magnitude scaling factor MSF = {MSF:.6f}")
-
-    # C_sigma from SPT
-    try:
-        denom_c = 18.9 - 2.55 * sqrt(N1_60cs)
-        if denom_c <= 0:
-            C_sigma = 0.3
-        else:
-            C_sigma = 1.0 / denom_c
-            C_sigma = min(C_sigma, 0.3)
-    except Exception:
-        C_sigma = 0.3
-
-    st.write(f"C_sigma (SPT formula) = {C_sigma:.6f}")
-
-    # K_sigma
-    if sigma_v0 <= 0:
-        K_sigma = 1.0
-    else:
-        K_sigma = 1.0 - C_sigma * np.log(sigma_v0 / Pa)
-        K_sigma = min(K_sigma, 1.1)
+    if provide_MSF_manual:
+        st.info(f"Using user-provided MSF_max = {res['MSF_max']:.3f}")
 
-    st.write(f"K_sigma = {K_sigma:.6f}")
+    st.write(f"Magnitude scaling factor MSF = {res['MSF']:.6f}")
+    st.write(f"C_sigma (SPT formula) = {res['C_sigma']:.6f}")
+    st.write(f"K_sigma = {res['K_sigma']:.6f}")
 
-    CRR = CRR_base * MSF * K_sigma
+    CRR = res["CRR"]
     st.markdown("---")
     st.subheader("Final result (SPT path)")
     st.metric("Cyclic Resistance Ratio (CRR)", f"{CRR:.6e}")
 
     st.caption("This module expects N60 input. If you have raw N, compute N60 first using correction factors.")
+
+    # -------------------------------
+    # Depth profile
+    # -------------------------------
+    st.markdown("---")
+    st.subheader("CRR profile over SPT depths")
+    st.caption("One row per SPT test depth. Pa, Mw, iteration settings and MSF_max are taken from above.")
+
+    profile_data = np.array([
+        [1.5, 10.0, 25.0, 25.0, 5.0],
+        [3.0, 15.0, 45.0, 45.0, 5.0],
+        [4.5, 20.0, 60.0, 60.0, 5.0],
+    ])
+    profile = st.data_editor(
+        profile_data,
+        column_config={
+            1: "Depth z (m)",
+            2: "N60",
+            3: "σ'vc (kPa)",
+            4: "σ'v0 (kPa)",
+            5: "FC (%)",
+        },
+        num_rows="dynamic",
+        key="spt_profile",
+    )
+
+    profile = np.asarray(profile, dtype=np.float64).reshape(-1, 5)
+    profile = profile[~np.isnan(profile).any(axis=1)]
+    if len(profile) == 0:
+        st.info("Add at least one complete row to compute a CRR profile.")
+        return
+
+    z = profile[:, 0]
+    prof = _compute_crr_spt_profile(
+        profile[:, 1], profile[:, 2], profile[:, 3], float(Pa), float(M), profile[:, 4],
+        float(init_m), float(tol), int(max_iter),
+        float(MSF_max_user) if provide_MSF_manual else None,
+    )
+
+    if not prof["converged"].all():
+        st.warning(f"{int((~prof['converged']).sum())} depth(s) did not converge within {prof['iter_count']} iterations.")
+
+    st.dataframe(
+        {
+            "Depth z (m)": z,
+            "(N1)60cs": prof["N1_60cs"],
+            "CRR_base": prof["CRR_base"],
+            "K_sigma": prof["K_sigma"],
+            "CRR": prof["CRR"],
+        },
+        use_container_width=True,
+    )
+    st.line_chart({"Depth z (m)": z, "CRR": prof["CRR"]}, x="Depth z (m)", y="CRR")
@@ -0,0 +1,233 @@
+"""
+Shared SPT arithmetic for the CRR-SPT path (no widgets; Streamlit is only
+used for the cache decorators).
+
+_solve_m / _finalize give the single-point result; _compute_crr_spt_profile
+runs the same formulas on arrays.
+"""
+
+from types import MappingProxyType
+
+import streamlit as st
+import numpy as np
+from math import exp, log, sqrt
+
+# CRR_base = exp(-2.8 + N/14.1 + (N/126)^2 - (N/23.6)^3 + (N/25.4)^4), in Horner form
+_C1 = 1.0 / 14.1
+_C2 = (1.0 / 126.0) ** 2
+_C3 = -(1.0 / 23.6) ** 3
+_C4 = (1.0 / 25.4) ** 4
+
+@st.cache_resource
+def _constants():
+    """Correlation constants used by the SPT path (shared across sessions, read-only)."""
+    return MappingProxyType({
+        "msf_cap": 2.2,
+        "C_sigma_cap": 0.3,
+        "K_sigma_cap": 1.1,
+    })
+
+
+def _solve_m(N60, Pa, sigma_vc, FC, init_m, tol, max_iter):
+    """
+    Fixed-point iteration (SPT) for m and (N1)60cs.
+
+    Returns (m, N1_60cs, CN, N1_60, iter_count, converged), where CN and
+    N1_60 are the values from the last iteration.
+    """
+    q = N60
+    m = float(init_m)
+    N1_60cs = None
+    converged = False
+
+    # CN = min((Pa/sigma_vc)^m, 1.7) evaluated in the log domain
+    logR = log(Pa / sigma_vc) if sigma_vc > 0 else 0.0
+    capN = log(1.7)
+
+    # fines correction depends on FC only
+    denom = FC + 0.01
+    if denom <= 0:
+        delta_N1_60 = 0.0
+    else:
+        delta_N1_60 = exp(1.63 + (9.7 / denom) - (15.7 / denom) ** 2)
+
+    for it in range(max_iter):
+        CN = exp(min(m * logR, capN))
+        N1_60 = CN * q
+        N1_60cs = max(N1_60 + delta_N1_60, 1e-6)
+
+        m_new = 0.784 - 0.0768 * sqrt(N1_60cs)
+
+##        # clamp m if desired
+##        m_new = min(max(m_new, 0.246), 0.782)
+
+        converged = abs(m_new - m) < tol
+        m = m_new
+        if converged:
+            iter_count = it + 1
+            break
+    else:
+        iter_count = max_iter
+
+    return m, N1_60cs, CN, N1_60, iter_count, converged
+
+
+def _finalize(N1_60cs, sigma_v0, Pa, M, MSF_max_user):
+    """
+    Post-iteration SPT terms in one pass over plain floats.
+
+    Returns (CRR_base, msf_max_spt, MSF_max, MSF, C_sigma, K_sigma, CRR);
+    MSF_max_user is None when MSF_max should come from the SPT expression.
+    """
+    const = _constants()
+    N = N1_60cs
+
+    CRR_base = exp(-2.8 + N * (_C1 + N * (_C2 + N * (_C3 + N * _C4))))
+
+    msf_max_spt = min(1.09 * (N / 31.5) ** 2, const["msf_cap"])
+    MSF_max = msf_max_spt if MSF_max_user is None else MSF_max_user
+    MSF = 1.0 + (MSF_max - 1.0) * (8.64 * exp(-0.25 * M) - 1.325)
+
+    # C_sigma from SPT
+    denom_c = 18.9 - 2.55 * sqrt(N)
+    C_sigma = const["C_sigma_cap"] if denom_c <= 0 else min(1.0 / denom_c, const["C_sigma_cap"])
+
+    # K_sigma
+    if sigma_v0 <= 0:
+        K_sigma = 1.0
+    else:
+        K_sigma = min(1.0 - C_sigma * log(sigma_v0 / Pa), const["K_sigma_cap"])
+
+    return CRR_base, msf_max_spt, MSF_max, MSF, C_sigma, K_sigma, CRR_base * MSF * K_sigma
+
+
+@st.cache_data(show_spinner=False)
+def _compute_crr_spt(N60, sigma_vc, sigma_v0, Pa, M, FC, init_m, tol, max_iter, MSF_max_user):
+    """
+    Full SPT path: iteration for m, then CRR_base, MSF, C_sigma, K_sigma and CRR.
+
+    MSF_max_user is None when MSF_max should come from the SPT expression.
+    Returns a dict of all derived quantities.
+    """
+    m, N1_60cs, CN, N1_60, iter_count, converged = _solve_m(
+        N60, Pa, sigma_vc, FC, init_m, tol, max_iter
+    )
+
+    CRR_base, msf_max_spt, MSF_max, MSF, C_sigma, K_sigma, CRR = _finalize(
+        N1_60cs, sigma_v0, Pa, M, MSF_max_user
+    )
+
+    return {
+        "m": m,
+        "N1_60cs": N1_60cs,
+        "CN": CN,
+        "N1_60": N1_60,
+        "iter_count": iter_count,
+        "converged": converged,
+        "CRR_base": CRR_base,
+        "msf_max_spt": msf_max_spt,
+        "MSF_max": MSF_max,
+        "MSF": MSF,
+        "C_sigma": C_sigma,
+        "K_sigma": K_sigma,
+        "CRR": CRR,
+    }
+
+
+@st.cache_data(show_spinner=False)
+def _compute_crr_spt_profile(N60_arr, sigma_vc_arr, sigma_v0_arr, Pa, M, FC_arr,
+                             init_m, tol, max_iter, MSF_max_user):
+    """
+    Vectorized SPT path over a depth profile (one array element per depth).
+
+    Same formulas as _solve_m / _compute_crr_spt, with the m iteration run on
+    all depths at once; each depth is frozen once it converges, so its result
+    does not depend on the other rows. Returns a dict of arrays plus the
+    number of passes needed by the slowest depth.
+    """
+    const = _constants()
+    N60_arr = np.asarray(N60_arr, dtype=np.float64)
+    sigma_vc_arr = np.asarray(sigma_vc_arr, dtype=np.float64)
+    sigma_v0_arr = np.asarray(sigma_v0_arr, dtype=np.float64)
+    FC_arr = np.asarray(FC_arr, dtype=np.float64)
+
+    # CN = min((Pa/sigma_vc)^m, 1.7) in the log domain; CN = 1 where sigma_vc <= 0
+    vc_ok = sigma_vc_arr > 0
+    logR = np.zeros_like(sigma_vc_arr)
+    np.log(Pa / np.where(vc_ok, sigma_vc_arr, Pa), out=logR, where=vc_ok)
+    capN = log(1.7)
+
+    # fines correction depends on FC only
+    denom = FC_arr + 0.01
+    safe_denom = np.where(denom > 0, denom, 1.0)
+    delta_N1_60 = np.where(
+        denom > 0,
+        np.exp(1.63 + (9.7 / safe_denom) - (15.7 / safe_denom) ** 2),
+        0.0,
+    )
+
+    # scratch buffers are allocated once; the loop only uses in-place ufuncs
+    m = np.full_like(N60_arr, init_m)
+    m_new = np.empty_like(N60_arr)
+    CN = np.empty_like(N60_arr)
+    N1 = np.empty_like(N60_arr)
+    N1_60cs = np.full_like(N60_arr, 1e-6)
+    diff = np.empty_like(N60_arr)
+    active = np.empty(N60_arr.shape, dtype=bool)
+    step_ok = np.empty(N60_arr.shape, dtype=bool)
+    converged = np.zeros(N60_arr.shape, dtype=bool)
+    iter_count = max_iter
+    for it in range(max_iter):
+        np.multiply(m, logR, out=CN)
+        np.minimum(CN, capN, out=CN)
+        np.exp(CN, out=CN)
+        np.multiply(CN, N60_arr, out=N1)
+        N1 += delta_N1_60
+        np.maximum(N1, 1e-6, out=N1)
+        np.sqrt(N1, out=m_new)
+        m_new *= -0.0768
+        m_new += 0.784
+        np.subtract(m_new, m, out=diff)
+        np.abs(diff, out=diff)
+        # depths that converged earlier keep the m / N1_60cs they stopped at,
+        # so each depth ends exactly where _solve_m would
+        np.logical_not(converged, out=active)
+        np.copyto(m, m_new, where=active)
+        np.copyto(N1_60cs, N1, where=active)
+        np.less(diff, tol, out=step_ok)
+        np.logical_or(converged, step_ok, out=converged)
+        if converged.all():
+            iter_count = it + 1
+            break
+
+    # CRR base (Horner form)
+    N = N1_60cs
+    CRR_base = np.exp(-2.8 + N * (_C1 + N * (_C2 + N * (_C3 + N * _C4))))
+
+    msf_max_spt = np.minimum(1.09 * (N / 31.5) ** 2, const["msf_cap"])
+    MSF_max = msf_max_spt if MSF_max_user is None else MSF_max_user
+    MSF = 1.0 + (MSF_max - 1.0) * (8.64 * exp(-0.25 * M) - 1.325)
+
+    # C_sigma from SPT
+    denom_c = 18.9 - 2.55 * np.sqrt(N)
+    C_sigma = np.where(
+        denom_c > 0,
+        np.minimum(1.0 / np.where(denom_c > 0, denom_c, 1.0), const["C_sigma_cap"]),
+        const["C_sigma_cap"],
+    )
+
+    # K_sigma
+    v0_ok = sigma_v0_arr > 0
+    log_v0 = np.log(np.where(v0_ok, sigma_v0_arr, Pa) / Pa)
+    K_sigma = np.where(v0_ok, np.minimum(1.0 - C_sigma * log_v0, const["K_sigma_cap"]), 1.0)
+
+    return {
+        "m": m,
+        "N1_60cs": N,
+        "iter_count": iter_count,
+        "converged": converged,
+        "CRR_base": CRR_base,
+        "MSF": MSF,
+        "K_sigma": K_sigma,
+        "CRR": CRR_base * MSF * K_sigma,
+    }
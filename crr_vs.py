@@ -12,11 +12,61 @@ Non-iterative method.
 import streamlit as st
 import numpy as np
 
+
+def _crr_vs_base(Vs, sigma_v0, Pa, FC):
+    """Vectorized core: Vs1, Vs1_star and CRR_base for scalars or arrays."""
+    Vs = np.asarray(Vs, dtype=np.float64)
+    sigma_v0 = np.asarray(sigma_v0, dtype=np.float64)
+    FC = np.asarray(FC, dtype=np.float64)
+
+    # Vs1 = (Pa / sigma_v0)^0.25 * Vs  (fourth root as two square roots)
+    v0_ok = sigma_v0 > 0
+    r = Pa / np.where(v0_ok, sigma_v0, Pa)
+    Vs1 = np.where(v0_ok, np.sqrt(np.sqrt(r)) * Vs, Vs)
+
+    # Vs1* definition based on FC
+    Vs1_star = np.where(FC < 5.0, 200.0 + 15.0 * ((35.0 - FC) / 30.0), 215.0)
+
+    # constants
+    a = 0.022
+    b = 2.8
+
+    # CRR_Mw=7.5; the hyperbolic term only applies for 0 < Vs1 < Vs1*
+    # (safe_gap = inf outside that range so 1/safe_gap never divides by zero)
+    in_range = (Vs1 > 0) & (Vs1 < Vs1_star)
+    safe_gap = np.where(in_range, Vs1_star - Vs1, np.inf)
+    CRR_base = a * (Vs1 / 100.0) ** 2 + np.where(in_range, b * (1.0 / safe_gap - 1.0 / Vs1_star), 0.0)
+
+    return Vs1, Vs1_star, CRR_base
+
+
+@st.cache_data(show_spinner=False)
+def _compute_crr_vs(Vs, sigma_v0, Pa, FC, MSF, K_sigma):
+    """Vs path: returns a dict with Vs1, Vs1_star, CRR_base and CRR."""
+    Vs1, Vs1_star, CRR_base = (float(x) for x in _crr_vs_base(Vs, sigma_v0, Pa, FC))
+
+    return {
+        "Vs1": Vs1,
+        "Vs1_star": Vs1_star,
+        "CRR_base": CRR_base,
+        "CRR": CRR_base * MSF * K_sigma,
+    }
+
+
+@st.cache_data(show_spinner=False)
+def _compute_crr_vs_profile(Vs_arr, sigma_v0_arr, Pa, FC_arr, MSF, K_sigma):
+    """Vs path over a depth profile (one array element per depth)."""
+    Vs1, Vs1_star, CRR_base = _crr_vs_base(Vs_arr, sigma_v0_arr, Pa, FC_arr)
+
+    return {
+        "Vs1": Vs1,
+        "Vs1_star": Vs1_star,
+        "CRR_base": CRR_base,
+        "CRR": CRR_base * MSF * K_sigma,
+    }
+
+
 def run():
-    st.set_page_config(
-        page_title="CRR — Vs Calculator",
-        layout="wide"
-    )
     st.header("CRR — Vs method (shear wave velocity)")
 
     st.markdown("""
@@ -43,23 +93,19 @@ def run():
     st.markdown("---")
     st.subheader("Overburden-corrected shear wave velocity")
 
-    # Vs1 = (Pa / sigma_v0)^0.25 * Vs
-    if sigma_v0 > 0:
-        Vs1 = (Pa / sigma_v0) ** 0.25 * Vs
-    else:
-        Vs1 = Vs
+    res = _compute_crr_vs(Vs, sigma_v0, Pa, FC, MSF, K_sigma)
+    Vs1 = res["Vs1"]
+    Vs1_star = res["Vs1_star"]
+    CRR_base = res["CRR_base"]
 
     st.write(f"Vs₁ (overburden-corrected shear wave velocity) = {Vs1:.3f} m/s")
 
     st.markdown("---")
     st.subheader("Limiting upper shear wave velocity Vs₁* for liquefaction")
 
-    # Vs1* definition based on FC
     if FC < 5.0:
-        Vs1_star = 200.0 + 15.0 * ((35.0 - FC) / 30.0)
         st.write("FC < 5% → interpolated Vs₁*")
     else:
-        Vs1_star = 215.0
         st.write("FC ≥ 5% → Vs₁* = 215 m/s")
 
     st.write(f"Vs₁* (limiting value) = {Vs1_star:.3f} m/s")
@@ -70,24 +116,59 @@ def run():
     st.markdown("---")
     st.subheader("CRR computation")
 
-    # constants
-    a = 0.022
-    b = 2.8
-
-    # CRR_Mw=7.5
-    if Vs1 > 0 and Vs1 < Vs1_star:
-        CRR_base = a * (Vs1 / 100.0) ** 2 + b * ((1.0 / (Vs1_star - Vs1)) - (1.0 / Vs1_star))
-    else:
-        CRR_base = a * (Vs1 / 100.0) ** 2
-
     st.write(f"CRR_base (Mw = 7.5, σ'v0 = 1 atm) = {CRR_base:.6f}")
     st.write(f"Applied MSF = {MSF:.6f}")
     st.write(f"Applied Kσ = {K_sigma:.6f}")
 
-    CRR = CRR_base * MSF * K_sigma
+    CRR = res["CRR"]
 
     st.markdown("---")
     st.subheader("Final result (Vs path)")
     st.metric("Cyclic Resistance Ratio (CRR)", f"{CRR:.6e}")
 
     st.caption("CRR computed using shear wave velocity correlation. Ensure applicability limits for soil type and fines content.")
+
+    # Depth profile
+    st.markdown("---")
+    st.subheader("CRR profile over Vs depths")
+    st.caption("One row per Vs measurement depth. Pa, MSF and Kσ are taken from above.")
+
+    profile_data = np.array([
+        [2.0, 150.0, 30.0, 5.0],
+        [4.0, 170.0, 55.0, 5.0],
+        [6.0, 190.0, 80.0, 5.0],
+    ])
+    profile = st.data_editor(
+        profile_data,
+        column_config={
+            1: "Depth z (m)",
+            2: "Vs (m/s)",
+            3: "σ'v0 (kPa)",
+            4: "FC (%)",
+        },
+        num_rows="dynamic",
+        key="vs_profile",
+    )
+
+    profile = np.asarray(profile, dtype=np.float64).reshape(-1, 4)
+    profile = profile[~np.isnan(profile).any(axis=1)]
+    if len(profile) == 0:
+        st.info("Add at least one complete row to compute a CRR profile.")
+        return
+
+    z = profile[:, 0]
+    prof = _compute_crr_vs_profile(
+        profile[:, 1], profile[:, 2], float(Pa), profile[:, 3], float(MSF), float(K_sigma),
+    )
+
+    st.dataframe(
+        {
+            "Depth z (m)": z,
+            "Vs1 (m/s)": prof["Vs1"],
+            "Vs1* (m/s)": prof["Vs1_star"],
+            "CRR_base": prof["CRR_base"],
+            "CRR": prof["CRR"],
+        },
+        use_container_width=True,
+    )
+    st.line_chart({"Depth z (m)": z, "CRR": prof["CRR"]}, x="Depth z (m)", y="CRR")
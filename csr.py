@@ -1,24 +1,124 @@
-def run():
-    import streamlit as st
-    import numpy as np
-    import math
-    import base64
-
-    def show_pdf(path):
-        with open(path, "rb") as f:
-            pdf_bytes = f.read()
-        b64_pdf = base64.b64encode(pdf_bytes).decode("utf-8")
-        pdf_display = f"""
-            <iframe src="data:application/pdf;base64,{b64_pdf}"
-                    width="100%" height="600"
-                    type="application/pdf">
-            </iframe>
-        """
-        st.markdown(pdf_display, unsafe_allow_html=True)
+import streamlit as st
+import numpy as np
+import base64
+
+
+# -------------------------------
+# Stress reduction factor
+# -------------------------------
+def compute_rd(z, M):
+    # z may be a scalar or an array of depths
+    z = np.asarray(z, dtype=np.float64)
+    alpha_z = -1.012 - 1.126 * np.sin(z / 11.73 + 5.133)
+    beta_z  =  0.106 + 0.118 * np.sin(z / 11.28 + 5.142)
+    rd = np.exp(alpha_z + beta_z * M)
+    return rd
+
+
+def _stress_nodes(gamma, thickness):
+    """Layer-boundary depths and total vertical stress at them (both start at 0)."""
+    depth_nodes = np.concatenate([[0.0], np.cumsum(thickness)])
+    sigma_cum = np.concatenate([[0.0], np.cumsum(gamma * thickness)])
+    return depth_nodes, sigma_cum
+
+
+@st.cache_data(show_spinner=False)
+def _compute_csr(gamma, thickness, z, wt_depth, gamma_w, amax_g, M):
+    """
+    CSR at depth z. Returns a dict with sigma_vo, u0, sigma_vo_eff, rd and CSR
+    (rd and CSR are None when the effective stress is not positive).
+    """
+    # 1. Total vertical stress at z (linear within each layer)
+    depth_nodes, sigma_cum = _stress_nodes(gamma, thickness)
+    sigma_vo = np.interp(z, depth_nodes, sigma_cum)
+
+    # 2. Pore pressure
+    if z <= wt_depth:
+        u0 = 0.0
+    else:
+        u0 = gamma_w * (z - wt_depth)
+
+    # 3. Effective stress
+    sigma_vo_eff = sigma_vo - u0
+
+    rd = None
+    CSR = None
+    if sigma_vo_eff > 0:
+        # 4. Stress reduction factor
+        rd = compute_rd(z, M)
 
+        # 5. CSR
+        CSR = 0.65 * amax_g * (sigma_vo / sigma_vo_eff) * rd
 
+    return {
+        "sigma_vo": sigma_vo,
+        "u0": u0,
+        "sigma_vo_eff": sigma_vo_eff,
+        "rd": rd,
+        "CSR": CSR,
+    }
+
+
+@st.cache_data(show_spinner=False)
+def _compute_csr_profile(gamma, thickness, dz, wt_depth, gamma_w, amax_g, M):
+    """
+    CSR vs depth, as arrays, every dz metres down the soil column.
+
+    Layer bases are always included. Depths where the effective stress is
+    not positive get CSR = NaN.
+    """
+    depth_nodes, sigma_cum = _stress_nodes(gamma, thickness)
+    # grid as dz * k (no accumulated arange error); points within 1e-9 m of a
+    # layer base are dropped so each base appears once
+    total = depth_nodes[-1]
+    grid = dz * np.arange(1, int(np.ceil(total / dz)) + 1)
+    grid = grid[grid < total]
+    near_base = np.isclose(grid[:, None], depth_nodes[None, 1:], rtol=0.0, atol=1e-9).any(axis=1)
+    z = np.union1d(grid[~near_base], depth_nodes[1:])
+    z = z[z > 0]
+    sigma_vo = np.interp(z, depth_nodes, sigma_cum)
+
+    u0 = gamma_w * np.maximum(z - wt_depth, 0.0)
+    sigma_vo_eff = sigma_vo - u0
+
+    ok = sigma_vo_eff > 0
+    ratio = np.divide(sigma_vo, sigma_vo_eff, out=np.full_like(sigma_vo, np.nan), where=ok)
+    CSR = 0.65 * amax_g * ratio * compute_rd(z, M)
+
+    return {
+        "z": z,
+        "sigma_vo": sigma_vo,
+        "sigma_vo_eff": sigma_vo_eff,
+        "CSR": CSR,
+    }
+
+
+# -------------------------------
+# Reference files (read once per process)
+# -------------------------------
+@st.cache_data(show_spinner=False)
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@st.cache_data(show_spinner=False)
+def _encoded_pdf(path):
+    return base64.b64encode(_read_bytes(path)).decode("utf-8")
+
+
+def show_pdf(path):
+    b64_pdf = _encoded_pdf(path)
+    pdf_display = f"""
+        <iframe src="data:application/pdf;base64,{b64_pdf}"
+                width="100%" height="600"
+                type="application/pdf">
+        </iframe>
+    """
+    st.markdown(pdf_display, unsafe_allow_html=True)
 
 
+def run():
     print("""
     ========================================================
     CYCLIC STRESS RATIO (CSR) CALCULATION PROGRAM
@@ -76,24 +176,6 @@ def run():
     ========================================================
     """)
 
-    # -------------------------------
-    # Stress reduction factor
-    # -------------------------------
-    def compute_rd(z, M):
-        alpha_z = -1.012 - 1.126 * math.sin(z / 11.73 + 5.133)
-        beta_z  =  0.106 + 0.118 * math.sin(z / 11.28 + 5.142)
-        rd = math.exp(alpha_z + beta_z * M)
-        return rd
-
-
-    # -------------------------------
-    # UI CONFIG
-    # -------------------------------
-    st.set_page_config(
-        page_title="CSR Calculator",
-        layout="wide"
-    )
-
     st.title("Cyclic Stress Ratio (CSR) Calculator")
     st.markdown("**Simplified liquefaction analysis using IS 1893 Part 1**")
 
@@ -125,7 +207,7 @@ def run():
         show_pdf("EQ_Code_Refs/CSR.pdf")
         
     with st.sidebar.expander("Peak Acceleration Ratio Values"):
-        st.image("EQ_Code_Refs/SA_g.png")
+        st.image(_read_bytes("EQ_Code_Refs/SA_g.png"))
     st.sidebar.markdown(
         "[Prathamesh Varma](https://prathameshvarma.wordpress.com/)"
     )
@@ -136,18 +218,19 @@ def run():
     # -------------------------------
     st.subheader("Soil Layer Properties")
 
-    soil_data = np.ones((n_layers, 2))
+    soil_data = np.ones((n_layers, 2), dtype=np.float64)
     soil_df = st.data_editor(
         soil_data,
         column_config={
             1: "Unit weight γ (kN/m³)",
             2: "Thickness h (m)"
         },
-        num_rows="fixed"
+        num_rows="fixed",
+        key="soil",
     )
 
-    gamma = soil_df[:, 0]
-    thickness = soil_df[:, 1]
+    arr = np.ascontiguousarray(soil_df, dtype=np.float64)
+    gamma, thickness = arr[:, 0], arr[:, 1]
 
     # -------------------------------
     # Groundwater input
@@ -161,6 +244,10 @@ def run():
             "Liquefaction check depth z (m)",
             min_value=0.1, value=float(np.sum(thickness))
         )
+        dz = st.number_input(
+            "Profile depth step Δz (m)",
+            min_value=0.1, value=0.5
+        )
 
     with col2:
         wt_depth = st.number_input(
@@ -179,27 +266,17 @@ def run():
     # -------------------------------
     if st.button("▶ Compute CSR"):
 
-        # 1. Total vertical stress
-        sigma_vo = np.sum(gamma * thickness)
-
-        # 2. Pore pressure
-        if z <= wt_depth:
-            u0 = 0.0
-        else:
-            u0 = gamma_w * (z - wt_depth)
-
-        # 3. Effective stress
-        sigma_vo_eff = sigma_vo - u0
+        res = _compute_csr(gamma, thickness, z, wt_depth, gamma_w, amax_g, M)
+        sigma_vo = res["sigma_vo"]
+        u0 = res["u0"]
+        sigma_vo_eff = res["sigma_vo_eff"]
 
         if sigma_vo_eff <= 0:
             st.error("Effective vertical stress ≤ 0. Check inputs.")
             st.stop()
 
-        # 4. Stress reduction factor
-        rd = compute_rd(z, M)
-
-        # 5. CSR
-        CSR = 0.65 * amax_g * (sigma_vo / sigma_vo_eff) * rd
+        rd = res["rd"]
+        CSR = res["CSR"]
 
         # -------------------------------
         # OUTPUT
@@ -218,3 +295,20 @@ def run():
             st.metric("Cyclic Stress Ratio (CSR)", f"{CSR:.4f}")
 
         st.success("CSR calculation completed successfully.")
+
+        # -------------------------------
+        # CSR vs depth
+        # -------------------------------
+        st.subheader("CSR vs depth")
+
+        prof = _compute_csr_profile(gamma, thickness, dz, wt_depth, gamma_w, amax_g, M)
+        st.dataframe(
+            {
+                "Depth z (m)": prof["z"],
+                "σᵥ₀ (kPa)": prof["sigma_vo"],
+                "σ′ᵥ₀ (kPa)": prof["sigma_vo_eff"],
+                "CSR": prof["CSR"],
+            },
+            use_container_width=True,
+        )
+        st.line_chart({"Depth z (m)": prof["z"], "CSR": prof["CSR"]}, x="Depth z (m)", y="CSR")